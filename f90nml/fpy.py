@@ -8,13 +8,19 @@ the values of basic Fortran data types into equivalent Python values.
 """
 import re
 
+# Fortran logical constants, in lowercase
+true_values = frozenset(('.true.', '.t.', 'true', 't'))
+false_values = frozenset(('.false.', '.f.', 'false', 'f'))
+
+# Signed exponents without an exponent character (e.g. 1.0+3)
+implicit_exp_re = re.compile('(?<=[^eEdD])(?=[+-])')
+
 
 def pyfloat(v_str):
     """Convert string repr of Fortran floating point to Python double."""
     # NOTE: There is no loss of information from SP to DP floats
 
-    return float(re.sub('(?<=[^eEdD])(?=[+-])', 'e',
-                        v_str.lower().replace('d', 'e')))
+    return float(implicit_exp_re.sub('e', v_str.lower().replace('d', 'e')))
 
 
 def pycomplex(v_str):
@@ -48,9 +54,9 @@ def pybool(v_str, strict_logical=True):
             raise ValueError('{0} is not a valid logical constant.'
                              ''.format(v_str))
 
-    if v_bool in ('.true.', '.t.', 'true', 't'):
+    if v_bool in true_values:
         return True
-    elif v_bool in ('.false.', '.f.', 'false', 'f'):
+    elif v_bool in false_values:
         return False
     else:
         raise ValueError('{0} is not a valid logical constant.'.format(v_str))
@@ -704,204 +704,240 @@ class Namelist(OrderedDict):
         if sort:
             grp_vars = Namelist(sorted(grp_vars.items(), key=lambda t: t[0]))
 
-        print('&{0}'.format(grp_name), file=nml_file)
+        grp_strs = ['&{0}'.format(grp_name)]
 
         for v_name, v_val in grp_vars.items():
 
             v_start = grp_vars.start_index.get(v_name, None)
 
-            for v_str in self._var_strings(v_name, v_val, v_start=v_start):
-                print(v_str, file=nml_file)
+            self._var_strings(v_name, v_val, v_start=v_start, out=grp_strs)
 
-        print('/', file=nml_file)
+        grp_strs.append('/')
 
-    def _var_strings(self, v_name, v_values, v_idx=None, v_start=None):
-        """Convert namelist variable to list of fixed-width strings."""
+        print('\n'.join(grp_strs), file=nml_file)
+
+    def _var_strings(self, v_name, v_values, v_idx=None, v_start=None,
+                     out=None):
+        """Convert namelist variable to list of fixed-width strings.
+
+        If a list `out` is provided, then the strings are appended to `out`
+        and it is returned in place of a new list.
+        """
         if self.uppercase:
             v_name = v_name.upper()
 
-        var_strs = []
+        var_strs = out if out is not None else []
+        emit = self._var_emitter(v_values)
+        emit(v_name, v_values, var_strs, v_idx=v_idx, v_start=v_start)
+
+        return var_strs
 
-        # Parse a multidimensional array
+    def _var_emitter(self, v_values):
+        """Return the output method which matches the shape of `v_values`."""
         if is_nullable_list(v_values, list):
-            if not v_idx:
-                v_idx = []
+            return self._emit_multidim
+        elif isinstance(v_values, Namelist):
+            return self._emit_derived
+        elif is_nullable_list(v_values, Namelist):
+            return self._emit_derived_array
+        else:
+            return self._emit_values
 
-            i_s = v_start[::-1][len(v_idx)] if v_start else None
+    def _emit_multidim(self, v_name, v_values, out, v_idx=None, v_start=None):
+        """Append the strings of a multidimensional array to `out`."""
+        if not v_idx:
+            v_idx = []
 
-            # FIXME: We incorrectly assume 1-based indexing if it is
-            # unspecified.  This is necessary because our output method always
-            # separates the outer axes to one per line.  But we cannot do this
-            # if we don't know the first index (which we are no longer assuming
-            # to be 1-based elsewhere).  Unfortunately, the solution needs a
-            # rethink of multidimensional output.
+        i_s = v_start[::-1][len(v_idx)] if v_start else None
 
-            # NOTE: Fixing this would also clean up the output of todict(),
-            # which is now incorrectly documenting unspecified indices as 1.
+        # FIXME: We incorrectly assume 1-based indexing if it is
+        # unspecified.  This is necessary because our output method always
+        # separates the outer axes to one per line.  But we cannot do this
+        # if we don't know the first index (which we are no longer assuming
+        # to be 1-based elsewhere).  Unfortunately, the solution needs a
+        # rethink of multidimensional output.
 
-            # For now, we will assume 1-based indexing here, just to keep
-            # things working smoothly.
-            if i_s is None:
-                i_s = 1
+        # NOTE: Fixing this would also clean up the output of todict(),
+        # which is now incorrectly documenting unspecified indices as 1.
 
-            for idx, val in enumerate(v_values, start=i_s):
-                v_idx_new = v_idx + [idx]
-                v_strs = self._var_strings(v_name, val, v_idx=v_idx_new,
-                                           v_start=v_start)
-                var_strs.extend(v_strs)
+        # For now, we will assume 1-based indexing here, just to keep
+        # things working smoothly.
+        if i_s is None:
+            i_s = 1
 
-        # Parse derived type contents
-        elif isinstance(v_values, Namelist):
-            for f_name, f_vals in v_values.items():
-                v_title = '%'.join([v_name, f_name])
+        for idx, val in enumerate(v_values, start=i_s):
+            emit = self._var_emitter(val)
+            emit(v_name, val, out, v_idx=v_idx + [idx], v_start=v_start)
 
-                v_start_new = v_values.start_index.get(f_name, None)
+    def _emit_derived(self, v_name, v_values, out, v_idx=None, v_start=None):
+        """Append the strings of a derived type to `out`."""
+        for f_name, f_vals in v_values.items():
+            v_start_new = v_values.start_index.get(f_name, None)
 
-                v_strs = self._var_strings(v_title, f_vals,
-                                           v_start=v_start_new)
-                var_strs.extend(v_strs)
+            if self.uppercase:
+                f_name = f_name.upper()
+            v_title = v_name + '%' + f_name
 
-        # Parse an array of derived types
-        elif is_nullable_list(v_values, Namelist):
-            if not v_idx:
-                v_idx = []
+            emit = self._var_emitter(f_vals)
+            emit(v_title, f_vals, out, v_start=v_start_new)
 
-            i_s = v_start[::-1][len(v_idx)] if v_start else 1
+    def _emit_derived_array(self, v_name, v_values, out, v_idx=None,
+                            v_start=None):
+        """Append the strings of an array of derived types to `out`."""
+        if not v_idx:
+            v_idx = []
 
-            for idx, val in enumerate(v_values, start=i_s):
+        i_s = v_start[::-1][len(v_idx)] if v_start else 1
 
-                # Skip any empty elements in a list of derived types
-                if val is None:
-                    continue
+        for idx, val in enumerate(v_values, start=i_s):
 
-                v_title = v_name + '({0})'.format(idx)
+            # Skip any empty elements in a list of derived types
+            if val is None:
+                continue
 
-                v_strs = self._var_strings(v_title, val)
-                var_strs.extend(v_strs)
+            v_title = '{0}({1})'.format(v_name, idx)
 
-        else:
-            use_default_start_index = False
-            if not isinstance(v_values, list):
-                v_values = [v_values]
-                use_default_start_index = False
-            else:
-                use_default_start_index = self.default_start_index is not None
-
-            # Print the index range
-
-            # TODO: Include a check for len(v_values) to determine if vector
-            if v_idx or v_start or use_default_start_index:
-                v_idx_repr = '('
+            self._emit_derived(v_title, val, out)
 
-                if v_start or use_default_start_index:
-                    if v_start:
-                        i_s = v_start[0]
-                    else:
-                        i_s = self.default_start_index
+    def _emit_values(self, v_name, v_values, out, v_idx=None, v_start=None):
+        """Append the strings of a scalar or one-dimensional array to `out`."""
+        if not isinstance(v_values, list):
+            v_values = [v_values]
+            use_default_start_index = False
+        else:
+            use_default_start_index = self.default_start_index is not None
 
-                    if i_s is None:
-                        v_idx_repr += ':'
+        # Print the index range
 
-                    else:
-                        i_e = i_s + len(v_values) - 1
+        # TODO: Include a check for len(v_values) to determine if vector
+        if v_idx or v_start or use_default_start_index:
+            v_idx_repr = '('
 
-                        if i_s == i_e:
-                            v_idx_repr += '{0}'.format(i_s)
-                        else:
-                            v_idx_repr += '{0}:{1}'.format(i_s, i_e)
+            if v_start or use_default_start_index:
+                if v_start:
+                    i_s = v_start[0]
                 else:
-                    v_idx_repr += ':'
+                    i_s = self.default_start_index
 
-                if v_idx:
-                    idx_delim = ', ' if self._index_spacing else ','
-                    v_idx_repr += idx_delim
-                    v_idx_repr += idx_delim.join(str(i) for i in v_idx[::-1])
+                if i_s is None:
+                    v_idx_repr += ':'
 
-                v_idx_repr += ')'
+                else:
+                    i_e = i_s + len(v_values) - 1
 
+                    if i_s == i_e:
+                        v_idx_repr += '{0}'.format(i_s)
+                    else:
+                        v_idx_repr += '{0}:{1}'.format(i_s, i_e)
             else:
-                v_idx_repr = ''
+                v_idx_repr += ':'
 
-            # Split output across multiple lines (if necessary)
-            v_header = self.indent + v_name + v_idx_repr + ' = '
-            val_strs = []
-            val_line = v_header
+            if v_idx:
+                idx_delim = ', ' if self._index_spacing else ','
+                v_idx_repr += idx_delim
+                v_idx_repr += idx_delim.join(str(i) for i in v_idx[::-1])
 
-            if self._repeat_counter:
-                v_values = list(
-                    self.RepeatValue(len(list(x)), val)
-                    for val, x in itertools.groupby(v_values)
-                )
+            v_idx_repr += ')'
 
-            for i_val, v_val in enumerate(v_values):
-                # Increase column width if the header exceeds this value
-                if len(v_header) >= self.column_width:
-                    column_width = len(v_header) + 1
-                else:
-                    column_width = self.column_width
+        else:
+            v_idx_repr = ''
 
-                if len(val_line) < column_width:
-                    # NOTE: We allow non-strings to extend past the column
-                    #   limit, but strings will be split as needed.
-                    v_str = self._f90repr(v_val)
+        # Split output across multiple lines (if necessary)
+        v_header = self.indent + v_name + v_idx_repr + ' = '
+        v_indent = ' ' * len(v_header)
+        val_strs = []
+        val_line = v_header
 
-                    # Set a comma placeholder if needed
-                    if i_val < len(v_values) - 1 or self.end_comma:
-                        v_comma = ', '
-                    else:
-                        v_comma = ''
+        # Increase column width if the header exceeds this value
+        if len(v_header) >= self.column_width:
+            column_width = len(v_header) + 1
+        else:
+            column_width = self.column_width
+
+        # NOTE: Runs are keyed by type, so that equal values of different
+        #   types (e.g. 1, 1.0 and True) are not collapsed into one repeat.
+        if self._repeat_counter:
+            v_values = [
+                self.RepeatValue(len(list(run)), val)
+                for (_, val), run in itertools.groupby(
+                    zip(map(type, v_values), v_values)
+                )
+            ]
+
+        # Bind the formatting state outside of the value loop
+        f90repr = self._f90repr
+
+        # If the values share an intrinsic type, then bypass the type checks
+        # of _f90repr and use the type's formatter directly.
+        if v_values:
+            v_type = type(v_values[0])
+            if (v_type in self._f90repr_methods
+                    and all(type(v) is v_type for v in v_values)):
+                f90repr = getattr(self, self._f90repr_methods[v_type])
+
+        end_comma = self.end_comma
+        split_strings = self.split_strings
+        i_last = len(v_values) - 1
+
+        for i_val, v_val in enumerate(v_values):
+            if len(val_line) < column_width:
+                # NOTE: We allow non-strings to extend past the column
+                #   limit, but strings will be split as needed.
+                v_str = f90repr(v_val)
+
+                # Set a comma placeholder if needed
+                if i_val < i_last or end_comma:
+                    v_comma = ', '
+                else:
+                    v_comma = ''
 
-                    if self.split_strings and isinstance(v_val, str):
-                        idx = column_width - len(val_line + v_comma.rstrip())
+                if split_strings and isinstance(v_val, str):
+                    idx = column_width - len(val_line + v_comma.rstrip())
 
-                        # Split the line along idx until we either exceed the
-                        #   column width, or read the end of the string.
-                        v_l, v_r = v_str[:idx], v_str[idx:]
+                    # Split the line along idx until we either exceed the
+                    #   column width, or read the end of the string.
+                    v_l, v_r = v_str[:idx], v_str[idx:]
 
-                        if v_r:
-                            # Check if string can fit on the next line
-                            new_val_line = (
-                                ' ' * len(v_header) + v_str + v_comma
-                            )
-                            if len(new_val_line.rstrip()) <= column_width:
+                    if v_r:
+                        # Check if string can fit on the next line
+                        new_val_line = v_indent + v_str + v_comma
+                        if len(new_val_line.rstrip()) <= column_width:
+                            val_strs.append(val_line)
+                            val_line = v_indent
+                        else:
+                            # Split string across multiple lines
+                            while v_r:
+                                val_line += v_l
                                 val_strs.append(val_line)
-                                val_line = ' ' * len(v_header)
-                            else:
-                                # Split string across multiple lines
-                                while v_r:
-                                    val_line += v_l
-                                    val_strs.append(val_line)
-                                    val_line = ''
-
-                                    idx = column_width - len(v_comma.rstrip())
-                                    v_l, v_r = v_r[:idx], v_r[idx:]
+                                val_line = ''
 
-                                v_str = v_l
+                                idx = column_width - len(v_comma.rstrip())
+                                v_l, v_r = v_r[:idx], v_r[idx:]
 
-                    val_line += v_str + v_comma
+                            v_str = v_l
 
-                # Line break
-                if len(val_line) >= column_width:
-                    # Append current line to list of lines
-                    val_strs.append(val_line.rstrip())
+                val_line += v_str + v_comma
 
-                    # Start new line with space corresponding to header
-                    val_line = ' ' * len(v_header)
-
-            # Append any remaining values
-            if val_line and not val_line.isspace():
+            # Line break
+            if len(val_line) >= column_width:
+                # Append current line to list of lines
                 val_strs.append(val_line.rstrip())
 
-            # Final null values must always precede a comma
-            if val_strs and (len(v_values) == 0 or v_values[-1] is None):
-                # NOTE: val_strs has been rstrip-ed so lead with a space
-                val_strs[-1] += ' ,'
+                # Start new line with space corresponding to header
+                val_line = v_indent
 
-            # Complete the set of values
-            if val_strs:
-                var_strs.extend(val_strs)
+        # Append any remaining values
+        val_line = val_line.rstrip()
+        if val_line:
+            val_strs.append(val_line)
 
-        return var_strs
+        # Final null values must always precede a comma
+        if val_strs and (len(v_values) == 0 or v_values[-1] is None):
+            # NOTE: val_strs has been rstrip-ed so lead with a space
+            val_strs[-1] += ' ,'
+
+        # Complete the set of values
+        out.extend(val_strs)
 
     def todict(self, complex_tuple=False):
         """Return a dict equivalent to the namelist.
@@ -960,6 +996,15 @@ class Namelist(OrderedDict):
 
         return nmldict
 
+    # Formatters of the intrinsic types handled by _f90repr
+    _f90repr_methods = {
+        bool: '_f90bool',
+        int: '_f90int',
+        float: '_f90float',
+        complex: '_f90complex',
+        str: '_f90str',
+    }
+
     def _f90repr(self, value):
         """Convert primitive Python types to equivalent Fortran strings."""
         if isinstance(value, self.RepeatValue):
@@ -9,7 +9,7 @@ hierarchy of Python dicts containing equivalent intrinsic Python data types.
 from __future__ import print_function
 
 import warnings
-import copy
+from collections import OrderedDict
 from string import whitespace
 import itertools
 
@@ -18,6 +18,45 @@ from f90nml.fpy import pyfloat, pycomplex, pybool, pystr
 from f90nml.namelist import Namelist
 from f90nml.tokenizer import Tokenizer
 
+# Token sets used to identify variables and the end of their values
+var_tokens = frozenset(('=', '(', '%'))
+grp_start_tokens = frozenset(('&', '$'))
+grp_end_tokens = frozenset(('/', '&', '$'))
+null_end_tokens = grp_end_tokens | frozenset((',',))
+value_end_tokens = grp_end_tokens | frozenset(('=',))
+null_start_tokens = frozenset(('=', '%', ','))
+
+# Token sets used to delimit array indices
+idx_start_tokens = frozenset((',', '('))
+idx_end_tokens = frozenset((',', ')'))
+
+# Shared patch for variables without patch values; this must not be modified
+empty_patch = Namelist()
+
+# Value conversions, in order of precedence
+recast_funcs = (int, pyfloat, pycomplex, pybool, pystr)
+
+# Conversions which may succeed for a given leading character.  Each sequence
+# preserves the order of `recast_funcs`, omitting any types which cannot
+# start with that character.
+recast_numeric = (int, pyfloat, pystr)
+recast_real = (pyfloat, pystr)
+recast_logical = (pybool, pystr)
+recast_dot = (pyfloat, pybool, pystr)
+
+recast_dispatch = {"'": (pystr,), '"': (pystr,), '(': (pycomplex, pystr),
+                   '.': recast_dot}
+recast_dispatch.update(dict.fromkeys('0123456789+-', recast_numeric))
+recast_dispatch.update(dict.fromkeys('abcdeghjklmopqrsuvwxyz'
+                                     'ABCDEGHJKLMOPQRSUVWXYZ', (pystr,)))
+recast_dispatch.update(dict.fromkeys('tfTF', recast_logical))
+recast_dispatch.update(dict.fromkeys('inIN', recast_real))
+
+# Numeric values with a decimal point or exponent are never integers, and
+# values with a leading decimal point but no digit, such as .true., are never
+# numeric.
+real_chars = frozenset('.eEdD')
+
 
 class Parser(object):
     """Fortran namelist parser."""
@@ -26,16 +65,20 @@ class Parser(object):
         """Create the parser object."""
         # Token management
         self.tokens = None
+        self.token_idx = None
+        self._value_cache = {}
         self.token = None
         self.prior_token = None
 
         # Patching
         self.pfile = None
+        self._patch_buf = None
 
         # Configuration
         self._default_start_index = 1
         self._global_start_index = None
         self._comment_tokens = '!'
+        self._skip_chars = frozenset(self._comment_tokens + whitespace)
         self._sparse_arrays = False
         self._row_major = False
         self._strict_logical = True
@@ -70,6 +113,9 @@ class Parser(object):
             raise TypeError('comment_tokens attribute must be a string.')
         self._comment_tokens = value
 
+        # Leading characters of tokens which are skipped by the parser
+        self._skip_chars = frozenset(value + whitespace)
+
     @property
     def default_start_index(self):
         """Assumed starting index for a vector.
@@ -259,7 +305,7 @@ class Parser(object):
             if not isinstance(nml_patch_in, dict):
                 raise TypeError('Input patch must be a dict or a Namelist.')
 
-            nml_patch = copy.deepcopy(Namelist(nml_patch_in))
+            nml_patch = copy_patch(nml_patch_in)
 
             if not patch_fname and nml_is_path:
                 patch_fname = nml_fname + '~'
@@ -272,6 +318,9 @@ class Parser(object):
                 self.pfile = open(patch_fname, 'w')
             else:
                 self.pfile = patch_fname
+
+            # Patch output is collected and written in a single call
+            self._patch_buf = []
         else:
             nml_patch = Namelist()
 
@@ -287,6 +336,10 @@ class Parser(object):
                 if nml_is_path:
                     nml_file.close()
         finally:
+            if self._patch_buf is not None:
+                self.pfile.write(''.join(self._patch_buf))
+                self._patch_buf = None
+
             if self.pfile and patch_is_path:
                 self.pfile.close()
 
@@ -297,7 +350,8 @@ class Parser(object):
         >>> data_nml = parser.reads('&data_nml x=1 y=2 /')
         """
         try:
-            return self._readstream(iter(nml_string.splitlines(True)))
+            # The string is tokenized whole, so it is not split into lines
+            return self._readstream([nml_string])
         except StopIteration:
             raise ValueError('End-of-file reached before end of namelist.')
 
@@ -305,35 +359,23 @@ class Parser(object):
         """Parse an input stream containing a Fortran namelist."""
         nml_patch = nml_patch_in if nml_patch_in is not None else Namelist()
 
+        # Read the source into a single buffer and tokenize it in one pass
+        if hasattr(nml_file, 'read'):
+            nml_source = nml_file.read()
+        else:
+            nml_source = ''.join(nml_file)
+
         tokenizer = Tokenizer()
         tokenizer.comment_tokens = self.comment_tokens
-        f90lex = []
-        for line in nml_file:
-            toks = tokenizer.parse(line)
-            while tokenizer.prior_delim:
-                new_toks = tokenizer.parse(next(nml_file))
+        f90lex = tokenizer.parse(nml_source)
 
-                # Skip empty lines
-                if not new_toks:
-                    continue
+        # Unterminated strings are reported as an incomplete namelist
+        if tokenizer.prior_delim:
+            raise StopIteration
 
-                # The tokenizer always pre-tokenizes the whitespace (leftover
-                # behaviour from Fortran source parsing) so this must be added
-                # manually.
-                if new_toks[0].isspace():
-                    toks[-1] += new_toks.pop(0)
-
-                # Append the rest of the string (if present)
-                if new_toks:
-                    toks[-1] += new_toks[0]
-
-                    # Attach the rest of the tokens
-                    toks.extend(new_toks[1:])
-
-            toks.append('\n')
-            f90lex.extend(toks)
-
-        self.tokens = iter(f90lex)
+        self.tokens = f90lex
+        self.token_idx = 0
+        self._value_cache = {}
 
         nmls = Namelist()
 
@@ -351,7 +393,7 @@ class Parser(object):
                     self._update_tokens()
 
                 # Ignore tokens outside of namelist groups
-                while self.token not in ('&', '$'):
+                while self.token not in grp_start_tokens:
                     self._update_tokens()
 
             except StopIteration:
@@ -365,15 +407,16 @@ class Parser(object):
             g_name = self.token
 
             g_vars = Namelist()
+            g_start_index = g_vars.start_index
             v_name = None
 
             # TODO: Edit `Namelist` to support case-insensitive `get` calls
-            grp_patch = nml_patch.pop(g_name.lower(), Namelist())
+            grp_patch = nml_patch.pop(g_name.lower(), empty_patch)
 
             # Populate the namelist group
             while g_name:
 
-                if self.token not in ('=', '%', '('):
+                if self.token not in var_tokens:
                     try:
                         self._update_tokens()
                     except StopIteration:
@@ -383,7 +426,7 @@ class Parser(object):
                         )
 
                 # Set the next active variable
-                if self.token in ('=', '(', '%'):
+                if self.token in var_tokens:
 
                     v_name, v_values = self._parse_variable(
                         g_vars,
@@ -394,30 +437,37 @@ class Parser(object):
                         v_prior_values = g_vars[v_name]
                         v_values = merge_values(v_prior_values, v_values)
 
-                    g_vars[v_name] = v_values
-
                     # Squeeze 1d list due to repeated variables
-                    for v_name, v_values in g_vars.items():
-                        if (
-                            isinstance(v_values, list)
-                            and len(v_values) == 1
-                            and v_name not in g_vars.start_index
-                        ):
-                            g_vars[v_name] = v_values[0]
+                    if (
+                        isinstance(v_values, list)
+                        and len(v_values) == 1
+                        and v_name.lower() not in g_start_index
+                    ):
+                        v_values = v_values[0]
+
+                    g_vars[v_name] = v_values
 
                     # Deselect variable
                     v_name = None
                     v_values = []
 
                 # Finalise namelist group
-                if self.token in ('/', '&', '$'):
+                if self.token in grp_end_tokens:
 
                     # Append any remaining patched variables
-                    for v_name, v_val in grp_patch.items():
-                        g_vars[v_name] = v_val
-                        v_strs = nmls._var_strings(v_name, v_val)
-                        for v_str in v_strs:
-                            self.pfile.write(v_str + '\n')
+                    if grp_patch:
+                        v_strs = []
+                        for v_name, v_val in grp_patch.items():
+                            g_vars[v_name] = v_val
+                            nmls._var_strings(v_name, v_val, out=v_strs)
+
+                        if v_strs:
+                            self._patch_buf.append('\n'.join(v_strs) + '\n')
+
+                    # Write the patch output once per group
+                    if self._patch_buf:
+                        self.pfile.write(''.join(self._patch_buf))
+                        del self._patch_buf[:]
 
                     # Append the grouplist to the namelist
                     if g_name in nmls:
@@ -435,8 +485,7 @@ class Parser(object):
 
         if nml_patch:
             # Append the contents to the namelist patch
-            print(file=self.pfile)
-            print(nml_patch, file=self.pfile)
+            self._patch_buf.append('\n{0}\n'.format(nml_patch))
 
             # Now append the values to the output namelist
             for grp in nml_patch:
@@ -447,11 +496,14 @@ class Parser(object):
     def _parse_variable(self, parent, patch_nml=None):
         """Parse a variable and return its name and values."""
         if not patch_nml:
-            patch_nml = Namelist()
+            patch_nml = empty_patch
 
         v_name = self.prior_token
+        v_name_lower = v_name.lower()
         v_values = []
 
+        start_index = parent.start_index
+
         # Patch state
         patch_values = None
 
@@ -464,8 +516,8 @@ class Parser(object):
             v_idx = FIndex(v_idx_bounds, self.global_start_index)
 
             # Update starting index against namelist record
-            if v_name.lower() in parent.start_index:
-                p_idx = parent.start_index[v_name.lower()]
+            if v_name_lower in start_index:
+                p_idx = start_index[v_name_lower]
 
                 for idx, pv in enumerate(zip(p_idx, v_idx.first)):
                     if all(i is None for i in pv):
@@ -476,8 +528,7 @@ class Parser(object):
                     v_idx.first[idx] = i_first
 
                 # Resize vector based on starting index
-                parent[v_name] = prepad_array(parent[v_name], p_idx,
-                                              v_idx.first)
+                prepad_array(parent[v_name], p_idx, v_idx.first)
             else:
                 # If variable already existed without an index, then assume a
                 #   1-based index
@@ -486,7 +537,7 @@ class Parser(object):
                     v_idx.first = [self.default_start_index
                                    for _ in v_idx.first]
 
-            parent.start_index[v_name.lower()] = v_idx.first
+            start_index[v_name_lower] = v_idx.first
 
             self._update_tokens()
 
@@ -507,17 +558,16 @@ class Parser(object):
             # If indexed variable already exists, then re-index this new
             #   non-indexed variable using the global start index
 
-            if v_name in parent.start_index:
-                p_start = parent.start_index[v_name.lower()]
+            if v_name_lower in start_index:
+                p_start = start_index[v_name_lower]
                 v_start = [self.default_start_index for _ in p_start]
 
                 # Resize vector based on new starting index
                 for i_p, i_v in zip(p_start, v_start):
                     if i_v < i_p:
-                        pad = [None for _ in range(i_p - i_v)]
-                        parent[v_name] = pad + parent[v_name]
+                        parent[v_name][:0] = [None] * (i_p - i_v)
 
-                parent.start_index[v_name.lower()] = v_start
+                start_index[v_name_lower] = v_start
 
         if self.token == '%':
 
@@ -526,10 +576,10 @@ class Parser(object):
             # Check for value in patch
             v_patch_nml = None
             if v_name in patch_nml:
-                v_patch_nml = patch_nml.get(v_name.lower())
+                v_patch_nml = patch_nml.get(v_name_lower)
 
             if parent:
-                vpar = parent.get(v_name.lower())
+                vpar = parent.get(v_name_lower)
                 if vpar and isinstance(vpar, list):
                     # If new element is not a list, then assume it's the first
                     # element of the list.
@@ -572,7 +622,7 @@ class Parser(object):
             # TODO: Edit `Namelist` to support case-insensitive `pop` calls
             #       (Currently only a problem in PyPy2)
             if v_name in patch_nml:
-                patch_values = patch_nml.pop(v_name.lower())
+                patch_values = patch_nml.pop(v_name_lower)
 
                 if not isinstance(patch_values, list):
                     patch_values = [patch_values]
@@ -580,8 +630,8 @@ class Parser(object):
                 p_idx = 0
 
             # Add variables until next variable trigger
-            while (self.token not in ('=', '(', '%') or
-                   (self.prior_token, self.token) in (('=', '('), (',', '('))):
+            while (self.token not in var_tokens or
+                   (self.token == '(' and self.prior_token in ('=', ','))):
 
                 # Check for repeated values
                 if self.token == '*':
@@ -592,18 +642,18 @@ class Parser(object):
                     n_vals = 1
 
                 # First check for implicit null values
-                if self.prior_token in ('=', '%', ','):
-                    if (self.token in (',', '/', '&', '$') and
+                if self.prior_token in null_start_tokens:
+                    if (self.token in null_end_tokens and
                             not (self.prior_token == ',' and
-                                 self.token in ('/', '&', '$'))):
+                                 self.token in grp_end_tokens)):
                         self._append_value(v_values, None, v_idx, n_vals)
 
                 elif self.prior_token == '*':
-                    if self.token not in ('/', '&', '$'):
+                    if self.token not in grp_end_tokens:
                         self._update_tokens()
 
                     if (self.prior_token == ',' or self.token == '='
-                            or (self.token in ('/', '&', '$')
+                            or (self.token in grp_end_tokens
                                 and self.prior_token == '*')):
                         next_value = None
 
@@ -624,28 +674,13 @@ class Parser(object):
                 n_vals = 1
 
                 # Exit for end of nml group (/, &, $) or null broadcast (=)
-                if self.token in ('/', '&', '$', '='):
+                if self.token in value_end_tokens:
                     break
                 else:
-                    # NOTE: it is probably very inefficient to keep re-creating
-                    # iterators upon every element; this solution reflects the
-                    # absence of mature lookahead in the script.
-                    #
-                    # This is a temporary fix to address errors caused by
-                    # patches of different length from the original value, and
-                    # represents a direction to fully rewrite the parser using
-                    # `tee`.
-
-                    # NOTE: We may be able to assume that self.token is a value
-                    #       rather than prepending it to the iterator.
-                    self.tokens, pre_lookahead = itertools.tee(self.tokens)
-                    lookahead = itertools.chain([self.token], pre_lookahead)
-
                     if patch_values:
+                        # Any token other than a separator is a value
                         # TODO: Patch indices that are not set in the namelist
-                        if (p_idx < len(patch_values)
-                                and check_for_value(lookahead)
-                                and self.token != ','):
+                        if p_idx < len(patch_values) and self.token != ',':
                             p_val = patch_values[p_idx]
                             p_repr = patch_nml._f90repr(patch_values[p_idx])
                             p_idx += 1
@@ -667,8 +702,10 @@ class Parser(object):
         if patch_values:
             v_values = patch_values
 
-        if not v_idx:
-            v_values = delist(v_values)
+        # Reduce unindexed lists of zero or one elements
+        if not v_idx and len(v_values) < 2:
+            v_values = v_values[0] if v_values else None
+
         return v_name, v_values
 
     def _parse_indices(self):
@@ -676,7 +713,7 @@ class Parser(object):
         v_name = self.prior_token
         v_indices = []
 
-        while self.token in (',', '('):
+        while self.token in idx_start_tokens:
             v_indices.append(self._parse_index(v_name))
 
         return v_indices
@@ -685,30 +722,27 @@ class Parser(object):
         """Parse Fortran vector indices into a tuple of Python indices."""
         i_start = i_end = i_stride = None
 
+        # NOTE: Delimiters are checked before conversion, so that int() only
+        #       raises ValueError for invalid indices.
+
         # Start index
         self._update_tokens()
-        try:
+        if self.token in idx_end_tokens:
+            raise ValueError('{0} index cannot be empty.'.format(v_name))
+        elif self.token != ':':
             i_start = int(self.token)
             self._update_tokens()
-        except ValueError:
-            if self.token in (',', ')'):
-                raise ValueError('{0} index cannot be empty.'.format(v_name))
-            elif not self.token == ':':
-                raise
 
         # End index
         if self.token == ':':
             self._update_tokens()
-            try:
+            if self.token == ':':
+                raise ValueError('{0} end index cannot be implicit '
+                                 'when using stride.'.format(v_name))
+            elif self.token not in idx_end_tokens:
                 i_end = 1 + int(self.token)
                 self._update_tokens()
-            except ValueError:
-                if self.token == ':':
-                    raise ValueError('{0} end index cannot be implicit '
-                                     'when using stride.'.format(v_name))
-                elif self.token not in (',', ')'):
-                    raise
-        elif self.token in (',', ')'):
+        elif self.token in idx_end_tokens:
             # Replace index with single-index range
             if i_start is not None:
                 i_end = 1 + i_start
@@ -716,14 +750,10 @@ class Parser(object):
         # Stride index
         if self.token == ':':
             self._update_tokens()
-            try:
-                i_stride = int(self.token)
-            except ValueError:
-                if self.token == ')':
-                    raise ValueError('{0} stride index cannot be '
-                                     'implicit.'.format(v_name))
-                else:
-                    raise
+            if self.token == ')':
+                raise ValueError('{0} stride index cannot be '
+                                 'implicit.'.format(v_name))
+            i_stride = int(self.token)
 
             if i_stride == 0:
                 raise ValueError('{0} stride index cannot be zero.'
@@ -731,7 +761,7 @@ class Parser(object):
 
             self._update_tokens()
 
-        if self.token not in (',', ')'):
+        if self.token not in idx_end_tokens:
             raise ValueError('{0} index did not terminate '
                              'correctly.'.format(v_name))
 
@@ -756,17 +786,33 @@ class Parser(object):
             assert self.token == ')'
 
             self._update_tokens(write_token, override)
-            v_str = '({0}, {1})'.format(v_re, v_im)
 
-        recast_funcs = [int, pyfloat, pycomplex, pybool, pystr]
+            # Convert the parts directly, or else keep the string
+            try:
+                return complex(pyfloat(v_re), pyfloat(v_im))
+            except ValueError:
+                return pystr('({0}, {1})'.format(v_re, v_im))
+
+        # Reuse the conversion of any value already seen in this namelist
+        try:
+            return self._value_cache[v_str]
+        except KeyError:
+            pass
+
+        recast = recast_dispatch.get(v_str[:1], recast_funcs)
+        if recast is recast_numeric and not real_chars.isdisjoint(v_str):
+            recast = recast_real
+        elif recast is recast_dot and not v_str[1:2].isdigit():
+            recast = recast_logical
 
-        for f90type in recast_funcs:
+        for f90type in recast:
             try:
                 # Unclever hack.. integrate this better
                 if f90type == pybool:
                     value = pybool(v_str, self.strict_logical)
                 else:
                     value = f90type(v_str)
+                self._value_cache[v_str] = value
                 return value
             except ValueError:
                 continue
@@ -774,122 +820,179 @@ class Parser(object):
     def _update_tokens(self, write_token=True, override=None,
                        patch_skip=False):
         """Update tokens to the next available values."""
-        next_token = next(self.tokens)
+        tokens = self.tokens
+        idx = self.token_idx
+        patch_buf = self._patch_buf
+        skip_chars = self._skip_chars
+
+        try:
+            next_token = tokens[idx]
+        except IndexError:
+            raise StopIteration
+        idx += 1
+
+        # Without a patch, the padding tokens are simply skipped
+        if patch_buf is None:
+            while next_token[0] in skip_chars:
+                try:
+                    next_token = tokens[idx]
+                except IndexError:
+                    self.token_idx = idx
+                    raise StopIteration
+                idx += 1
+
+            self.token, self.prior_token = next_token, self.token
+            self.token_idx = idx
+            return
+
+        comment_tokens = self.comment_tokens
 
         patch_value = ''
-        patch_tokens = ''
+        if write_token:
+            patch_value = override if override else self.token
 
-        if self.pfile and write_token:
-            token = override if override else self.token
-            patch_value += token
+        # Whitespace and comments are collected and added to the patch output
+        # after the patched value
+        patch_tokens = []
 
-        while next_token[0] in self.comment_tokens + whitespace:
-            if self.pfile:
-                if next_token[0] in self.comment_tokens:
-                    while not next_token == '\n':
-                        patch_tokens += next_token
-                        next_token = next(self.tokens)
-                patch_tokens += next_token
+        while next_token[0] in skip_chars:
+            if next_token[0] in comment_tokens:
+                while not next_token == '\n':
+                    patch_tokens.append(next_token)
+                    next_token = tokens[idx]
+                    idx += 1
+            patch_tokens.append(next_token)
 
             # Several sections rely on StopIteration to terminate token search
             # If that occurs, dump the patched tokens immediately
             try:
-                next_token = next(self.tokens)
-            except StopIteration:
-                if not patch_skip or next_token in ('=', '(', '%'):
-                    patch_tokens = patch_value + patch_tokens
+                next_token = tokens[idx]
+                idx += 1
+            except IndexError:
+                self.token_idx = idx
 
-                if self.pfile:
-                    self.pfile.write(patch_tokens)
-                raise
+                if not patch_skip or next_token in var_tokens:
+                    patch_buf.append(patch_value)
+
+                patch_buf.extend(patch_tokens)
+                raise StopIteration
 
         # Write patched values and whitespace + comments to file
-        if not patch_skip or next_token in ('=', '(', '%'):
-            patch_tokens = patch_value + patch_tokens
+        if not patch_skip or next_token in var_tokens:
+            patch_buf.append(patch_value)
 
-        if self.pfile:
-            self.pfile.write(patch_tokens)
+        patch_buf.extend(patch_tokens)
 
         # Update tokens, ignoring padding
         self.token, self.prior_token = next_token, self.token
+        self.token_idx = idx
 
     def _append_value(self, v_values, next_value, v_idx=None, n_vals=1):
         """Update a list of parsed values with a new value."""
-        for _ in range(n_vals):
-            if v_idx:
-                try:
-                    v_i = next(v_idx)
-                except StopIteration:
-                    # Repeating commas are null-statements and can be ignored
-                    # Otherwise, we warn the user that this is a bad namelist
-                    if next_value is not None:
-                        warnings.warn(
-                            'f90nml: warning: Value {v} is not assigned to '
-                            'any variable and has been removed.'
-                            ''.format(v=next_value)
-                        )
+        # Unindexed values are appended in order
+        if not v_idx:
+            if n_vals == 1:
+                v_values.append(next_value)
+            else:
+                v_values.extend(itertools.repeat(next_value, n_vals))
+            return
 
-                    # There are more values than indices, so we stop here
-                    break
+        v_s = [self.default_start_index if idx is None else idx
+               for idx in v_idx.first]
 
-                v_s = [self.default_start_index if idx is None else idx
-                       for idx in v_idx.first]
+        row_major = self.row_major
+        if not row_major:
+            v_s = v_s[::-1]
 
-                if not self.row_major:
-                    v_i = v_i[::-1]
-                    v_s = v_s[::-1]
+        # Pad the subarrays of multidimensional arrays.  One-dimensional
+        # arrays are padded when the value is assigned.
+        pad_subarrays = not self.sparse_arrays and len(v_s) > 1
 
-                # Multidimensional arrays
-                if not self.sparse_arrays:
-                    pad_array(v_values, list(zip(v_i, v_s)))
+        for _ in range(n_vals):
+            try:
+                v_i = next(v_idx)
+            except StopIteration:
+                # Repeating commas are null-statements and can be ignored
+                # Otherwise, we warn the user that this is a bad namelist
+                if next_value is not None:
+                    warnings.warn(
+                        'f90nml: warning: Value {v} is not assigned to '
+                        'any variable and has been removed.'
+                        ''.format(v=next_value)
+                    )
 
-                # We iterate inside the v_values and inspect successively
-                # deeper lists within the list tree.  If the requested index is
-                # missing, we re-size that particular entry.
-                # (NOTE: This is unnecessary when sparse_arrays is disabled.)
+                # There are more values than indices, so we stop here
+                break
 
-                v_subval = v_values
-                for (i_v, i_s) in zip(v_i[:-1], v_s[:-1]):
-                    try:
-                        v_subval = v_subval[i_v - i_s]
-                    except IndexError:
-                        size = len(v_subval)
-                        v_subval.extend([] for _ in range(size, i_v - i_s + 1))
-                        v_subval = v_subval[i_v - i_s]
+            if not row_major:
+                v_i = v_i[::-1]
+
+            if pad_subarrays:
+                pad_array(v_values, list(zip(v_i, v_s)))
+
+            # We iterate inside the v_values and inspect successively
+            # deeper lists within the list tree.  If the requested index is
+            # missing, we re-size that particular entry.
+            # (NOTE: This is unnecessary when sparse_arrays is disabled.)
 
-                # On the deepest level, we explicitly assign the value
-                i_v, i_s = v_i[-1], v_s[-1]
+            v_subval = v_values
+            for (i_v, i_s) in zip(v_i[:-1], v_s[:-1]):
                 try:
-                    v_subval[i_v - i_s] = next_value
+                    v_subval = v_subval[i_v - i_s]
                 except IndexError:
                     size = len(v_subval)
-                    v_subval.extend(None for _ in range(size, i_v - i_s + 1))
-                    v_subval[i_v - i_s] = next_value
-            else:
-                v_values.append(next_value)
+                    v_subval.extend([[] for _ in range(size, i_v - i_s + 1)])
+                    v_subval = v_subval[i_v - i_s]
+
+            # On the deepest level, we explicitly assign the value
+            i_v, i_s = v_i[-1], v_s[-1]
+            try:
+                v_subval[i_v - i_s] = next_value
+            except IndexError:
+                v_subval.extend([None] * (i_v - i_s + 1 - len(v_subval)))
+                v_subval[i_v - i_s] = next_value
 
 
 # Support functions
+def copy_patch(patch):
+    """Return a patch as a Namelist with copies of its dicts and lists."""
+    if isinstance(patch, dict):
+        items = patch.items()
+
+        # Unordered dicts are sorted, as in the Namelist constructor
+        if not isinstance(patch, OrderedDict):
+            items = sorted(items)
+
+        nml = Namelist((key, copy_patch(value)) for key, value in items)
+        if isinstance(patch, Namelist):
+            nml.start_index = dict(patch.start_index)
+        return nml
+
+    elif isinstance(patch, list):
+        return [copy_patch(value) for value in patch]
+
+    else:
+        return patch
+
+
 def prepad_array(var, v_start_idx, new_start_idx):
-    """Return a resized vector based on the new start index."""
-    prior_var = var[:]
+    """Resize a vector in-place based on the new start index."""
+    # Skip the array traversal if no start index has changed
+    if v_start_idx == new_start_idx:
+        return
 
     # Read the outer values
     i_p = v_start_idx[-1]
     i_v = new_start_idx[-1]
 
-    # Compute the outer index padding
-    if i_p is not None and i_v is not None and i_v < i_p:
-        pad = [None for _ in range(i_p - i_v)]
-    else:
-        pad = []
-
     # Apply prepad rules to interior arrays
-    for i, v in enumerate(var):
+    for v in var:
         if isinstance(v, list):
-            prior_var[i] = prepad_array(v, v_start_idx[:-1],
-                                        new_start_idx[:-1])
-    return pad + prior_var
+            prepad_array(v, v_start_idx[:-1], new_start_idx[:-1])
+
+    # Insert the outer index padding
+    if i_p is not None and i_v is not None and i_v < i_p:
+        var[:0] = [None] * (i_p - i_v)
 
 
 def pad_array(v, idx):
@@ -901,16 +1004,29 @@ def pad_array(v, idx):
         v.extend([[] for _ in range(len(v), i_v - i_s + 1)])
 
         # Pad elements
-        for e in v:
-            pad_array(e, idx[1:])
+        idx = idx[1:]
+        if len(idx) > 1:
+            for e in v:
+                pad_array(e, idx)
+        else:
+            # Only visit the innermost lists if any are too short
+            i_v, i_s = idx[0]
+            size = i_v - i_s + 1
+            if v and min(map(len, v)) < size:
+                for e in v:
+                    e.extend([None] * (size - len(e)))
     else:
-        v.extend([None for _ in range(len(v), i_v - i_s + 1)])
+        v.extend([None] * (i_v - i_s + 1 - len(v)))
 
 
 def merge_values(src, new):
     """Merge two lists or dicts into a single element."""
     if isinstance(src, dict) and isinstance(new, dict):
         return merge_dicts(src, new)
+    elif (not isinstance(src, (list, dict))
+            and not isinstance(new, (list, dict))):
+        # Repeated scalars need no list merge
+        return [src if new is None else new]
     else:
         if not isinstance(src, list):
             src = [src]
@@ -922,62 +1038,55 @@ def merge_values(src, new):
 
 def merge_lists(src, new):
     """Update a value list with a list of new or updated values."""
-    l_min, l_max = (src, new) if len(src) < len(new) else (new, src)
+    # Nested lists are merged from a stack rather than by recursion
+    merges = [(src, new)]
+    while merges:
+        l_src, l_new = merges.pop()
 
-    l_min.extend(None for i in range(len(l_min), len(l_max)))
+        l_min, l_max = ((l_src, l_new) if len(l_src) < len(l_new)
+                        else (l_new, l_src))
+        l_min.extend([None] * (len(l_max) - len(l_min)))
 
-    for i, val in enumerate(new):
-        if isinstance(val, dict) and isinstance(src[i], dict):
-            new[i] = merge_dicts(src[i], val)
-        elif isinstance(val, list) and isinstance(src[i], list):
-            new[i] = merge_lists(src[i], val)
-        elif val is not None:
-            new[i] = val
-        else:
-            new[i] = src[i]
+        # Skip the element checks if either list is entirely unset
+        if all(v is None for v in l_src):
+            continue
+        elif all(v is None for v in l_new):
+            l_new[:] = l_src
+            continue
+
+        for i, val in enumerate(l_new):
+            # Null values and unset sources need no type checks
+            if val is None:
+                l_new[i] = l_src[i]
+                continue
+
+            v_src = l_src[i]
+            if v_src is None:
+                continue
+            elif isinstance(val, dict) and isinstance(v_src, dict):
+                l_new[i] = merge_dicts(v_src, val)
+            elif isinstance(val, list) and isinstance(v_src, list):
+                merges.append((v_src, val))
 
     return new
 
 
 def merge_dicts(src, patch):
     """Merge contents of dict `patch` into `src`."""
-    for key in patch:
-        if key in src:
-            if isinstance(src[key], dict) and isinstance(patch[key], dict):
-                merge_dicts(src[key], patch[key])
+    # Nested dicts are merged from a stack rather than by recursion
+    merges = [(src, patch)]
+    while merges:
+        d_src, d_patch = merges.pop()
+        for key in d_patch:
+            value = d_patch[key]
+            if key not in d_src:
+                d_src[key] = value
+                continue
+
+            v_src = d_src[key]
+            if isinstance(v_src, dict) and isinstance(value, dict):
+                merges.append((v_src, value))
             else:
-                src[key] = merge_values(src[key], patch[key])
-        else:
-            src[key] = patch[key]
+                d_src[key] = merge_values(v_src, value)
 
     return src
-
-
-def delist(values):
-    """Reduce lists of zero or one elements to individual values."""
-    assert isinstance(values, list)
-
-    if not values:
-        return None
-    elif len(values) == 1:
-        return values[0]
-
-    return values
-
-
-def check_for_value(tokens):
-    """Return True if the next token is a value to be assigned."""
-    ntoks = 0
-    for tok in tokens:
-        if tok.isspace() or tok == ',':
-            continue
-        elif tok in ('=', '/', '$', '&'):
-            break
-        else:
-            ntoks += 1
-
-        # If ntoks reaches 2, then there must be at least one value.
-        if ntoks > 1:
-            break
-
-    return ntoks > 0
@@ -3,7 +3,7 @@
 :copyright: Copyright 2017 Marshall Ward, see AUTHORS for details.
 :license: Apache License, Version 2.0, see LICENSE for details.
 """
-import string
+import re
 
 
 class Tokenizer(object):
@@ -16,99 +16,91 @@ class Tokenizer(object):
     # I only use this one
     punctuation = '=*/\\()[]{},:;%&~<>?`|$#@'    # Unhandled Table 3.1 tokens
 
+    # Start of the first namelist group
+    group_re = re.compile(r'^[^\S\n]*[&$]', re.MULTILINE)
+
+    # Content outside of namelist groups is split into whitespace and comments
+    header_re = re.compile(r'\n|[^\S\n]+|[^\n]+')
+
+    # Compiled token patterns for each set of comment tokens
+    token_re_cache = {}
+
     def __init__(self):
         """Initialise the tokenizer."""
-        self.characters = None
-        self.prior_char = None
-        self.char = None
-        self.idx = None
-        self.whitespace = string.whitespace.replace('\n', '')
         self.prior_delim = None
 
-        # Set to true if inside a namelist group
-        self.group_token = None
-
         # Standard token sets
         self.comment_tokens = '!'
 
-    def parse(self, line):
-        """Tokenize a line of Fortran source."""
-        tokens = []
-
-        self.idx = -1   # Bogus value to ensure idx = 0 after first iteration
-        self.characters = iter(line)
-        self.update_chars()
-
-        while self.char != '\n':
-            # Update namelist group status
-            if self.char in ('&', '$'):
-                self.group_token = self.char
-
-            if self.group_token and (
-                    (self.group_token, self.char) in (('&', '/'), ('$', '$'))):
-                self.group_token = False
-
-            word = ''
-            if self.char in self.whitespace:
-                while self.char in self.whitespace:
-                    word += self.char
-                    self.update_chars()
-
-            elif self.char in self.comment_tokens or self.group_token is None:
-                # Abort the iteration and build the comment token
-                word = line[self.idx:-1]
-                self.char = '\n'
-
-            elif self.char in '"\'' or self.prior_delim:
-                word = self.parse_string()
-
-            elif self.char in Tokenizer.punctuation:
-                word = self.char
-                self.update_chars()
-
-            else:
-                while (not self.char.isspace()
-                       and self.char not in Tokenizer.punctuation):
-                    word += self.char
-                    self.update_chars()
+    def token_re(self):
+        """Return the token pattern for the current comment tokens.
+
+        The order of alternatives sets their precedence, so that comment
+        tokens will override any punctuation.
+
+        Strings may extend across newlines, and will extend to the end of the
+        source if they are not closed.
+        """
+        try:
+            return Tokenizer.token_re_cache[self.comment_tokens]
+        except KeyError:
+            pass
+
+        # NOTE: Newlines are excluded from whitespace so that they can be
+        #   reported as individual tokens.
+        patterns = [r'\n', r'[^\S\n]+']
+
+        if self.comment_tokens:
+            patterns.append(
+                r'[{0}][^\n]*'.format(re.escape(self.comment_tokens))
+            )
+
+        punct = re.escape(Tokenizer.punctuation)
+        patterns.extend([
+            r"'[^']*(?:''[^']*)*'?",
+            r'"[^"]*(?:""[^"]*)*"?',
+            r'[{0}]'.format(punct),
+            r'[^\s{0}]+'.format(punct),
+        ])
+
+        pattern = re.compile('|'.join(patterns))
+        Tokenizer.token_re_cache[self.comment_tokens] = pattern
+
+        return pattern
+
+    def parse(self, source):
+        """Tokenize a block of Fortran source.
+
+        Each newline of the source is returned as a separate token, and a
+        final newline is included if absent from the source.
+
+        Any content preceding the first namelist group is treated as a
+        comment.  Strings which extend across multiple lines are joined into a
+        single token, with the newlines removed.  If the source ends before a
+        string is closed, then its delimiter is saved in `prior_delim`.
+        """
+        group_match = self.group_re.search(source)
+        i_grp = group_match.end() - 1 if group_match else len(source)
+
+        tokens = self.header_re.findall(source, 0, i_grp)
+        n_header = len(tokens)
+        tokens.extend(self.token_re().findall(source, i_grp))
+
+        # Strip the newlines from any multiline strings
+        if tokens.count('\n') != source.count('\n'):
+            tokens = [tok if tok == '\n' else tok.replace('\n', '')
+                      for tok in tokens]
+
+        # Check for an unterminated string (content before the first group is
+        # a comment, and cannot open a string)
+        if len(tokens) > n_header and tokens[-1][0] in '\'"':
+            delim = tokens[-1][0]
+            content = tokens[-1][1:]
+            n_delims = len(content) - len(content.rstrip(delim))
+            if n_delims % 2 == 0:
+                self.prior_delim = delim
 
-            tokens.append(word)
+        if tokens and tokens[-1] != '\n':
+            tokens.append('\n')
 
         return tokens
-
-    def parse_string(self):
-        """Tokenize a Fortran string."""
-        word = ''
-
-        if self.prior_delim:
-            delim = self.prior_delim
-            self.prior_delim = None
-        else:
-            delim = self.char
-            word += self.char
-            self.update_chars()
-
-        while True:
-            if self.char == delim:
-                # Check for escaped delimiters
-                self.update_chars()
-                if self.char == delim:
-                    word += 2 * delim
-                    self.update_chars()
-                else:
-                    word += delim
-                    break
-            elif self.char == '\n':
-                self.prior_delim = delim
-                break
-            else:
-                word += self.char
-                self.update_chars()
-
-        return word
-
-    def update_chars(self):
-        """Update the current charters in the tokenizer."""
-        # NOTE: We spoof non-Unix files by returning '\n' on StopIteration
-        self.prior_char, self.char = self.char, next(self.characters, '\n')
-        self.idx += 1
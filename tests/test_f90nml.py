@@ -694,6 +694,22 @@ class Test(unittest.TestCase):
         test_nml = f90nml.read('string_multiline.nml')
         self.assertEqual(self.string_multiline_nml, test_nml)
 
+    def test_string_multiline_comment_token(self):
+        test_nml = f90nml.reads("&a_nml\n    s = 'abc\n!def'\n/\n")
+        self.assertEqual(test_nml, {'a_nml': {'s': 'abc!def'}})
+
+    def test_header_unterminated_quote(self):
+        self.assertEqual(f90nml.reads("'abc"), {})
+        self.assertEqual(f90nml.reads("hello\n'abc"), {})
+
+    def test_complex_negative_imag(self):
+        test_nml = f90nml.reads('&a_nml z = (1.0, -2.0) /\n')
+        self.assertEqual(test_nml, {'a_nml': {'z': 1-2j}})
+
+    def test_reindex_uppercase(self):
+        test_nml = f90nml.reads('&a_nml X(3) = 3 X = 1 /\n')
+        self.assertEqual(test_nml, {'a_nml': {'x': [1, None, 3]}})
+
     def test_dtype(self):
         test_nml = f90nml.read('dtype.nml')
         self.assertEqual(self.dtype_nml, test_nml)
@@ -934,6 +950,16 @@ class Test(unittest.TestCase):
         finally:
             os.remove('tmp.nml')
 
+    def test_patch_input_unchanged(self):
+        patch = {'types_nml': {'v_integer': [1, 2], 'v_dt': {'x': 1}}}
+        f90nml.patch('types.nml', patch, 'tmp.nml')
+        try:
+            self.assertEqual(
+                patch, {'types_nml': {'v_integer': [1, 2], 'v_dt': {'x': 1}}}
+            )
+        finally:
+            os.remove('tmp.nml')
+
     def test_default_patch(self):
         patch_nml = f90nml.read('types_patch.nml')
         f90nml.patch('types.nml', patch_nml)
@@ -1072,6 +1098,7 @@ class Test(unittest.TestCase):
     def test_column_width(self):
         test_nml = f90nml.read('multiline.nml')
         test_nml.column_width = 40
+        self.assertEqual(test_nml.column_width, 40)
         self.assert_write(test_nml, 'multiline_colwidth.nml')
 
         self.assertRaises(ValueError, setattr, test_nml, 'column_width', -1)
@@ -1582,6 +1609,17 @@ class Test(unittest.TestCase):
         line2 = out.readline()
         self.assertEqual(line2.lstrip(), "b = 2*.true., .false.\n")
 
+    def test_repeat_mixed_types(self):
+        nml_dict = {'a': {'b': [1, 1, 1.0, True, True]}}
+        nml = f90nml.Namelist(nml_dict)
+        nml.repeat_counter = True
+        out = StringIO()
+        print(nml, file=out)
+        out.seek(0)
+        line1 = out.readline()
+        line2 = out.readline()
+        self.assertEqual(line2.lstrip(), "b = 2*1, 1.0, 2*.true.\n")
+
     # Failed namelist parsing
     # NOTE: This is a very weak test, since '& x=1' / will pass
     def test_grp_token_end(self):